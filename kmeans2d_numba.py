@@ -0,0 +1,108 @@
+"""
+Lloyd's k-means specialised for 2-D points (numba)
+--------------------------------------------------
+sklearn's KMeans is generic over dimensionality, and at D=2 most of its time goes to
+dispatch and BLAS overhead rather than arithmetic. Here both coordinates are unrolled
+by hand, so the assignment step is a tight, SIMD-friendly loop run in parallel over points.
+
+KMeans2D mirrors the slice of the sklearn estimator API that zone_cluster_v2.py uses:
+fit_predict(X), cluster_centers_, labels_ and inertia_.
+"""
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _assign(X, C, labels):
+    # Nearest-centroid label per point; returns the inertia (sum of squared distances).
+    n, k = X.shape[0], C.shape[0]
+    inertia = 0.0
+    for i in prange(n):
+        x0, x1 = X[i, 0], X[i, 1]
+        best, best_j = np.inf, 0
+        for j in range(k):
+            d0 = x0 - C[j, 0]
+            d1 = x1 - C[j, 1]
+            d = d0 * d0 + d1 * d1
+            if d < best:
+                best, best_j = d, j
+        labels[i] = best_j
+        inertia += best
+    return inertia
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _update(X, labels, C, n_chunks):
+    # Move each centroid to the mean of its points; returns the total squared centroid shift.
+    # numba has no atomics, so each chunk accumulates private sums that are reduced afterwards.
+    n, k = X.shape[0], C.shape[0]
+    sums = np.zeros((n_chunks, k, 2))
+    counts = np.zeros((n_chunks, k), dtype=np.int64)
+    step = (n + n_chunks - 1) // n_chunks
+    for t in prange(n_chunks):
+        for i in range(t * step, min(n, (t + 1) * step)):
+            j = labels[i]
+            sums[t, j, 0] += X[i, 0]
+            sums[t, j, 1] += X[i, 1]
+            counts[t, j] += 1
+    shift = 0.0
+    for j in range(k):
+        s0, s1, cnt = 0.0, 0.0, 0
+        for t in range(n_chunks):
+            s0 += sums[t, j, 0]
+            s1 += sums[t, j, 1]
+            cnt += counts[t, j]
+        if cnt > 0:  # an empty cluster keeps its previous centroid
+            c0, c1 = s0 / cnt, s1 / cnt
+            shift += (c0 - C[j, 0]) ** 2 + (c1 - C[j, 1]) ** 2
+            C[j, 0], C[j, 1] = c0, c1
+    return shift
+
+
+def _kmeans_pp(X, k, rng):
+    # k-means++ seeding: each new centroid is drawn with probability proportional to D(x)^2.
+    n = X.shape[0]
+    C = np.empty((k, 2))
+    C[0] = X[rng.integers(n)]
+    d2 = ((X - C[0]) ** 2).sum(axis=1)
+    for j in range(1, k):
+        total = d2.sum()
+        idx = int(np.searchsorted(np.cumsum(d2), rng.random() * total)) if total > 0 else int(rng.integers(n))
+        C[j] = X[min(idx, n - 1)]
+        d2 = np.minimum(d2, ((X - C[j]) ** 2).sum(axis=1))
+    return C
+
+
+class KMeans2D:
+    def __init__(self, n_clusters=8, n_init=10, max_iter=300, tol=1e-4, random_state=None):
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.max_iter = max_iter
+        self.tol = tol
+        self.random_state = random_state
+
+    def fit(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != 2:
+            raise ValueError(f"KMeans2D expects an (N, 2) array, got shape {X.shape}")
+        if X.shape[0] < self.n_clusters:
+            raise ValueError(f"n_samples={X.shape[0]} should be >= n_clusters={self.n_clusters}.")
+        rng = np.random.default_rng(self.random_state)
+        tol = self.tol * float(X.var(axis=0).mean())  # same scale-relative tolerance as sklearn
+        n_chunks = max(1, min(get_num_threads(), X.shape[0]))
+        labels = np.empty(X.shape[0], dtype=np.int64)
+        best = None
+        for _ in range(self.n_init):
+            C = _kmeans_pp(X, self.n_clusters, rng)
+            for _ in range(self.max_iter):
+                _assign(X, C, labels)
+                if _update(X, labels, C, n_chunks) <= tol:
+                    break
+            inertia = _assign(X, C, labels)
+            if best is None or inertia < best[0]:
+                best = (inertia, C.copy(), labels.copy())
+        self.inertia_, self.cluster_centers_, self.labels_ = best
+        return self
+
+    def fit_predict(self, X):
+        return self.fit(X).labels_
@@ -6,6 +6,7 @@ Geo Zone Clusterer (Configurable)
 - Clusters addresses into K zones (K auto-chosen in [--kmin, --kmax] via silhouette score)
 - Outputs: CSV, Excel (one sheet per zone + Summary), Folium (Leaflet) map
 - Optional: Google Maps JS page you can host and share as a URL
+- Optional: --kmeans-impl numba2d, a 2-D specialised KMeans kernel (needs `pip install numba`)
 
 Examples
 --------
@@ -26,108 +27,335 @@ Notes
 - If your CSV already has lat,lon columns, geocoding is skipped.
 - QGIS plugins aren’t web APIs; if you choose `qgis` the script exits with instructions.
 """
-import argparse, os, sys, math, json, time, urllib.parse, urllib.request
+import argparse, os, sys, math, json, time, sqlite3, threading, http.client, urllib.error, urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Optional, Tuple
+import numpy as np
+import orjson
 import pandas as pd
 
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import pairwise_distances, silhouette_score
+from scipy.spatial import ConvexHull, QhullError
 import folium
-from shapely.geometry import Point, MultiPoint
+import jinja2
+from folium.plugins import FastMarkerCluster
 
 # ----------------------------- clustering helpers -----------------------------
 
-def choose_best_k(X, kmin=6, kmax=8, seed=42) -> int:
+M_PER_DEG = 111_320.0
+
+def to_local_xy(lat, lon, lat0, lon0) -> np.ndarray:
+    # Equirectangular projection around (lat0, lon0), in meters: Euclidean distance (what KMeans uses)
+    # is then roughly true ground distance at city scale, instead of stretching east-west with latitude.
+    return np.column_stack([(lon - lon0) * math.cos(math.radians(lat0)), lat - lat0]) * M_PER_DEG
+
+def from_local_xy(xy, lat0, lon0):
+    # Inverse of to_local_xy; returns (lat, lon) arrays.
+    xy = np.asarray(xy) / M_PER_DEG
+    return xy[:, 1] + lat0, xy[:, 0] / math.cos(math.radians(lat0)) + lon0
+
+def _top2_min(D):
+    # Smallest and second-smallest value of each row, via one O(N*k) partition instead of two argmins.
+    part = np.partition(D, 1, axis=1)
+    return part[:, 0], part[:, 1]
+
+def centroid_silhouette(X, centers) -> float:
+    # Silhouette approximation in O(N*k): a = distance to the nearest centroid (the point's own
+    # under KMeans), b = distance to the second nearest.
+    a, b = _top2_min(pairwise_distances(X, centers))
+    denom = np.maximum(a, b)
+    return float(np.divide(b - a, denom, out=np.zeros_like(denom), where=denom > 0).mean())
+
+def make_kmeans(impl: str, k: int, n_init: int, seed: int):
+    # "numba2d" is the hand-specialised 2-D Lloyd kernel; numba is only needed when it is selected.
+    if impl == "numba2d":
+        try:
+            from kmeans2d_numba import KMeans2D
+        except ImportError as e:
+            raise SystemExit(f"--kmeans-impl numba2d requires numba ({e}).")
+        return KMeans2D(n_clusters=k, n_init=n_init, random_state=seed)
+    return KMeans(n_clusters=k, n_init=n_init, random_state=seed)
+
+def choose_best_k(X, kmin=6, kmax=8, seed=42, patience=2, fast_silhouette=False, kmeans_impl="sklearn") -> int:
+    # Model selection only: cheap fits (MiniBatchKMeans, or the numba kernel) and a sampled silhouette.
+    # main() refits once at the chosen k with the full estimator from make_kmeans (n_init=25).
+    # Stops after `patience` consecutive k without a better score (patience <= 0 sweeps the whole range).
+    if kmin >= kmax:
+        return kmin  # nothing to choose between: skip the fit and the silhouette entirely
     best_k, best_score = kmin, -1
+    sample_size = min(5000, len(X))
+    stale = 0
     for k in range(kmin, kmax + 1):
-        km = KMeans(n_clusters=k, n_init=10, random_state=seed)
+        if kmeans_impl == "sklearn":
+            km = MiniBatchKMeans(n_clusters=k, batch_size=1024, n_init=3, random_state=seed)
+        else:
+            km = make_kmeans(kmeans_impl, k, n_init=3, seed=seed)
         labels = km.fit_predict(X)
         if len(set(labels)) == 1:
             continue
-        score = silhouette_score(X, labels)
+        if fast_silhouette:
+            score = centroid_silhouette(X, km.cluster_centers_)
+        else:
+            score = silhouette_score(X, labels, sample_size=sample_size, random_state=seed)
         if score > best_score:
             best_k, best_score = k, score
+            stale = 0
+        else:
+            stale += 1
+            if 0 < patience <= stale:
+                break
     return best_k
 
 # ----------------------------- geocoding helpers ------------------------------
 
-def assemble_query(row, city_context: Optional[str]) -> str:
-    # First check if there's a full "Address" column (capital A)
-    if "Address" in row and str(row.get("Address", "")).strip():
-        q = str(row.get("Address")).strip()
-        if city_context and city_context.lower() not in q.lower():
-            q = f"{q}, {city_context}"
-        return q
-
-    # Otherwise, assemble from individual components
-    parts = [str(row.get(c, "")).strip() for c in ["address","city","state","zip"] if str(row.get(c, "")).strip()]
-    q = ", ".join(parts)
-    if city_context and city_context.lower() not in q.lower():
-        q = f"{q}, {city_context}"
-    return q
-
-def _http_json(url: str) -> dict:
-    with urllib.request.urlopen(url) as r:
-        return json.loads(r.read().decode("utf-8"))
-
-def geocode_opencage(queries, api_key, delay=1.1):
+def assemble_queries(df: pd.DataFrame, city_context: Optional[str]) -> list:
+    # Column-wise string ops instead of one Series per row.
+    # Assemble from individual components, skipping blanks
+    q = pd.Series("", index=df.index)
+    for c in ["address","city","state","zip"]:
+        if c not in df.columns:
+            continue
+        part = df[c].fillna("").astype(str).str.strip()
+        q = q.where(part.eq(""), q.where(q.eq(""), q + ", ") + part)
+
+    # A full "Address" column (capital A) wins wherever it is filled in
+    if "Address" in df.columns:
+        full = df["Address"].fillna("").astype(str).str.strip()
+        q = full.where(full.ne(""), q)
+
+    if city_context:
+        has_ctx = q.str.lower().str.contains(city_context.lower(), regex=False)
+        q = q.where(has_ctx, q.where(q.eq(""), q + ", ") + city_context)
+    return q.tolist()
+
+_NAN_COORD = (float("nan"), float("nan"))
+_tls = threading.local()
+
+def _http_json(url: str, payload=None) -> dict:
+    # One keep-alive HTTPS connection per worker thread and host, so TLS sessions stay warm.
+    # With a payload the request is a JSON POST instead of a GET.
+    u = urllib.parse.urlsplit(url)
+    conns = getattr(_tls, "conns", None)
+    if conns is None:
+        conns = _tls.conns = {}
+    path = u.path + ("?" + u.query if u.query else "")
+    for attempt in (0, 1):
+        conn = conns.get(u.netloc)
+        if conn is None:
+            conn = conns[u.netloc] = http.client.HTTPSConnection(u.netloc, timeout=30)
+        try:
+            if payload is None:
+                conn.request("GET", path)
+            else:
+                conn.request("POST", path, body=json.dumps(payload).encode("utf-8"),
+                             headers={"Content-Type": "application/json"})
+            r = conn.getresponse()
+            body = r.read()
+            break
+        except (http.client.HTTPException, OSError):
+            # Server may have dropped an idle keep-alive connection; retry once on a fresh one.
+            # Never for a POST: the server may already have accepted it (e.g. a billed batch job).
+            conn.close()
+            del conns[u.netloc]
+            if attempt or payload is not None:
+                raise
+    if r.status >= 400:
+        raise urllib.error.HTTPError(url, r.status, r.reason, r.headers, None)
+    return json.loads(body.decode("utf-8"))
+
+class _RateLimiter:
+    """Token bucket shared by all worker threads: hands out start slots at least 1/qps apart."""
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_t = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            t = max(now, self.next_t)
+            self.next_t = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+# Throttling / transient server errors worth retrying; anything else (bad key, quota) is fatal.
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def _retry_delay(err, attempt: int, backoff: float) -> float:
+    # Honour a numeric Retry-After header when the server sends one, else exponential backoff.
+    retry_after = err.headers.get("Retry-After") if isinstance(err, urllib.error.HTTPError) and err.headers else None
+    try:
+        return min(float(retry_after), 60.0)
+    except (TypeError, ValueError):
+        return min(backoff * 2 ** attempt, 60.0)
+
+def _geocode_concurrent(queries, build_url, parse, max_workers=8, qps=1.0, retries=4, backoff=1.0, on_result=None):
+    # Overlaps network latency across threads while the limiter keeps us under the provider's QPS cap.
+    # Results come back in input order. A query that still fails after retries yields NaN instead of
+    # aborting the run and discarding every result already paid for. on_result(query, coord) is called
+    # in the calling thread as each lookup completes, so callers can persist progress as it arrives.
+    limiter = _RateLimiter(qps)
+    def one(q):
+        url = build_url(q)
+        for attempt in range(retries + 1):
+            limiter.wait()  # retries also take a slot, so they never burst past the cap
+            try:
+                return parse(_http_json(url))
+            except urllib.error.HTTPError as e:
+                if e.code not in _RETRY_STATUS:
+                    raise
+                err = e
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                err = e
+            if attempt < retries:
+                time.sleep(_retry_delay(err, attempt, backoff))
+        print(f"Geocoding failed after {retries + 1} attempts ({err}): {q!r}", file=sys.stderr)
+        return _NAN_COORD
+    out = [None] * len(queries)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futs = {ex.submit(one, q): i for i, q in enumerate(queries)}
+        try:
+            for fut in as_completed(futs):
+                i = futs[fut]
+                out[i] = fut.result()
+                if on_result:
+                    on_result(queries[i], out[i])
+        except BaseException:
+            ex.shutdown(cancel_futures=True)  # stop issuing (billed) requests nobody will read
+            if on_result:  # still hand over lookups that were in flight when the failure surfaced
+                for fut, i in futs.items():
+                    if out[i] is None and not fut.cancelled() and fut.exception() is None:
+                        on_result(queries[i], fut.result())
+            raise
+    return out
+
+def geocode_opencage(queries, api_key, max_workers=8, qps=1 / 1.1, on_result=None):  # ~10% under the 1 rps cap, absorbs network jitter
     if not api_key:
         raise SystemExit("OpenCage selected but no --opencage-key provided.")
-    out = []
-    for q in queries:
-        url = "https://api.opencagedata.com/geocode/v1/json?" + urllib.parse.urlencode({"q": q, "key": api_key, "limit": 1})
-        data = _http_json(url)
+    def build_url(q):
+        return "https://api.opencagedata.com/geocode/v1/json?" + urllib.parse.urlencode({"q": q, "key": api_key, "limit": 1})
+    def parse(data):
         if data.get("results"):
             g = data["results"][0]["geometry"]
-            out.append((g["lat"], g["lng"]))
-        else:
-            out.append((float("nan"), float("nan")))
-        time.sleep(delay)
-    return out
+            return (g["lat"], g["lng"])
+        return _NAN_COORD
+    return _geocode_concurrent(queries, build_url, parse, max_workers, qps, on_result=on_result)
 
-def geocode_geoapify(queries, api_key, delay=1.1):
+def geocode_geoapify(queries, api_key, max_workers=8, qps=1 / 1.1, on_result=None):  # ~10% under the 1 rps cap, absorbs network jitter
     if not api_key:
         raise SystemExit("Geoapify selected but no --geoapify-key provided.")
-    out = []
-    for q in queries:
-        url = "https://api.geoapify.com/v1/geocode/search?" + urllib.parse.urlencode({"text": q, "apiKey": api_key, "limit": 1})
-        data = _http_json(url)
+    def build_url(q):
+        return "https://api.geoapify.com/v1/geocode/search?" + urllib.parse.urlencode({"text": q, "apiKey": api_key, "limit": 1})
+    def parse(data):
         feats = data.get("features", [])
         if feats:
             lon, lat = feats[0]["geometry"]["coordinates"]
-            out.append((lat, lon))
-        else:
-            out.append((float("nan"), float("nan")))
-        time.sleep(delay)
+            return (lat, lon)
+        return _NAN_COORD
+    return _geocode_concurrent(queries, build_url, parse, max_workers, qps, on_result=on_result)
+
+def _geoapify_batch_job(queries, api_key, poll_timeout=600.0):
+    # Submit one batch job, then poll its result URL with exponential backoff until it completes.
+    job = _http_json("https://api.geoapify.com/v1/batch/geocode/search?" + urllib.parse.urlencode({"apiKey": api_key}),
+                     payload=list(queries))
+    if isinstance(job, list):
+        data = job
+    else:
+        url = job.get("url") or ("https://api.geoapify.com/v1/batch/geocode/search?"
+                                 + urllib.parse.urlencode({"id": job["id"], "apiKey": api_key}))
+        delay, deadline = 1.0, time.monotonic() + poll_timeout
+        while True:
+            time.sleep(delay)
+            data = _http_json(url)
+            if isinstance(data, list) or data.get("status") == "completed":
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Geoapify batch job {job.get('id')} still {data.get('status')!r} after {poll_timeout:.0f}s")
+            delay = min(delay * 2, 30.0)
+    results = data if isinstance(data, list) else data.get("results", [])
+    if len(results) != len(queries):
+        raise ValueError(f"Geoapify batch returned {len(results)} results for {len(queries)} queries")
+    out = []
+    for res in results:
+        lat, lon = res.get("lat"), res.get("lon")
+        out.append((lat, lon) if lat is not None and lon is not None else _NAN_COORD)
     return out
 
-def geocode_google(queries, api_key, delay=0.2):
+def geocode_geoapify_batch(queries, api_key, batch=1000, on_result=None):
+    # on_result(query, coord) fires per row as each chunk completes, like _geocode_concurrent.
     if not api_key:
-        raise SystemExit("Google selected but no --google-key provided.")
+        raise SystemExit("Geoapify selected but no --geoapify-key provided.")
     out = []
-    for q in queries:
-        url = "https://maps.googleapis.com/maps/api/geocode/json?" + urllib.parse.urlencode({"address": q, "key": api_key})
-        data = _http_json(url)
+    it = iter(queries)
+    while chunk := list(islice(it, batch)):
+        try:
+            coords = _geoapify_batch_job(chunk, api_key)
+        except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError, KeyError) as e:
+            print(f"Geoapify batch failed ({e}); falling back to per-query geocoding for {len(chunk)} rows.", file=sys.stderr)
+            out.extend(geocode_geoapify(chunk, api_key, on_result=on_result))
+            continue
+        if on_result:
+            for q, c in zip(chunk, coords):
+                on_result(q, c)
+        out.extend(coords)
+    return out
+
+def geocode_google(queries, api_key, max_workers=8, qps=10.0, on_result=None):  # well under Google's 50 QPS cap
+    if not api_key:
+        raise SystemExit("Google selected but no --google-key provided.")
+    def build_url(q):
+        return "https://maps.googleapis.com/maps/api/geocode/json?" + urllib.parse.urlencode({"address": q, "key": api_key})
+    def parse(data):
         res = data.get("results", [])
         if res:
             loc = res[0]["geometry"]["location"]
-            out.append((loc["lat"], loc["lng"]))
-        else:
-            out.append((float("nan"), float("nan")))
-        time.sleep(delay)
-    return out
-
-def geocode_df(df: pd.DataFrame, geocoder_name: str, keys: dict, city_context: Optional[str]) -> pd.DataFrame:
+            return (loc["lat"], loc["lng"])
+        return _NAN_COORD
+    return _geocode_concurrent(queries, build_url, parse, max_workers, qps, on_result=on_result)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".zone_cluster_cache")
+
+def _norm_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+class GeocodeCache:
+    """sqlite-backed (provider, normalized query) -> (lat, lon) store, so repeat runs skip the paid APIs."""
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, "geocode.sqlite"))
+        self.db.execute("CREATE TABLE IF NOT EXISTS geocode "
+                        "(provider TEXT, query TEXT, lat REAL, lon REAL, PRIMARY KEY (provider, query))")
+
+    def get_many(self, provider: str, queries) -> dict:
+        out, qs = {}, list(queries)
+        for i in range(0, len(qs), 500):  # stay under sqlite's bound-parameter limit
+            chunk = qs[i:i + 500]
+            rows = self.db.execute(f"SELECT query, lat, lon FROM geocode WHERE provider = ? "
+                                   f"AND query IN ({','.join('?' * len(chunk))})", [provider, *chunk])
+            out.update({q: (lat, lon) for q, lat, lon in rows})
+        return out
+
+    def put_many(self, provider: str, items):
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+                                [(provider, q, lat, lon) for q, (lat, lon) in items])
+
+    def close(self):
+        self.db.close()
+
+def geocode_df(df: pd.DataFrame, geocoder_name: str, keys: dict, city_context: Optional[str],
+               cache_dir: Optional[str] = None) -> pd.DataFrame:
     if {"lat","lon"}.issubset(df.columns):
         return df.copy()
 
-    queries = [assemble_query(row, city_context) for _, row in df.iterrows()]
     if geocoder_name == "opencage":
-        coords = geocode_opencage(queries, keys.get("opencage"))
+        fetch = lambda qs, cb: geocode_opencage(qs, keys.get("opencage"), on_result=cb)
     elif geocoder_name == "geoapify":
-        coords = geocode_geoapify(queries, keys.get("geoapify"))
+        fetch = lambda qs, cb: geocode_geoapify_batch(qs, keys.get("geoapify"), on_result=cb)
     elif geocoder_name == "google":
-        coords = geocode_google(queries, keys.get("google"))
+        fetch = lambda qs, cb: geocode_google(qs, keys.get("google"), on_result=cb)
     elif geocoder_name == "qgis":
         raise SystemExit(
             "QGIS geocoding is a desktop plugin, not a hosted API. "
@@ -136,6 +364,29 @@ def geocode_df(df: pd.DataFrame, geocoder_name: str, keys: dict, city_context: O
     else:
         raise SystemExit("Unknown geocoder: " + geocoder_name)
 
+    # Only unique queries missing from the cache go over the network; failed lookups are not cached.
+    # Hits are written as each lookup completes, so an aborted run keeps everything it already paid for.
+    queries = assemble_queries(df, city_context)
+    norm = [_norm_query(q) for q in queries]
+    cache = GeocodeCache(cache_dir) if cache_dir else None
+    try:
+        known = cache.get_many(geocoder_name, set(norm)) if cache else {}
+        todo = {}
+        for q, n in zip(queries, norm):
+            if n not in known:
+                todo.setdefault(n, q)
+        if todo:
+            norm_of = {q: n for n, q in todo.items()}
+            def record(q, c):
+                known[norm_of[q]] = c
+                if cache and not math.isnan(c[0]):
+                    cache.put_many(geocoder_name, [(norm_of[q], c)])
+            fetch(list(todo.values()), record)
+    finally:
+        if cache:
+            cache.close()
+    coords = [known[n] for n in norm]
+
     lats, lons = zip(*coords) if coords else ([], [])
     out = df.copy()
     out["lat"], out["lon"] = lats, lons
@@ -151,116 +402,154 @@ def color_cycle(n):
     ]
     return (base * ((n // len(base)) + 1))[:n]
 
-def make_folium_map(df: pd.DataFrame, centers: pd.DataFrame, center: Tuple[float,float], out_html: str):
+def _zone_colors(df: pd.DataFrame):
+    # Zones are numbered 1..k; returns (color per zone indexed by zone-1, 0-based zone index per row).
+    zone_idx = df["zone"].to_numpy().astype(np.int32) - 1
+    return np.array(color_cycle(int(zone_idx.max()) + 1)), zone_idx
+
+def _simplify_line(pts: np.ndarray, tolerance: float) -> np.ndarray:
+    # Douglas-Peucker on an (M,2) polyline; both endpoints are always kept.
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        seg, rel = pts[j] - pts[i], pts[i + 1:j] - pts[i]
+        norm = math.hypot(seg[0], seg[1])
+        if norm > 0:
+            d = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm
+        else:  # closed ring: first and last points coincide
+            d = np.hypot(rel[:, 0], rel[:, 1])
+        m = int(np.argmax(d))
+        if d[m] > tolerance:
+            keep[i + 1 + m] = True
+            stack += [(i, i + 1 + m), (i + 1 + m, j)]
+    return pts[keep]
+
+def _hull_ring(pts: np.ndarray, tolerance: float = 0.0) -> Optional[np.ndarray]:
+    # Closed convex hull ring (first vertex repeated at the end) of an (M,2) array; None when fewer than
+    # 3 points or all collinear. tolerance > 0 drops near-collinear vertices (Douglas-Peucker, in degrees)
+    # to shrink the emitted HTML.
+    if len(pts) < 3:
+        return None
+    try:
+        v = ConvexHull(pts).vertices
+    except QhullError:
+        return None
+    ring = pts[np.r_[v, v[:1]]]
+    if tolerance > 0 and len(ring) > 4:
+        simplified = _simplify_line(ring, tolerance)
+        if len(simplified) >= 4:
+            ring = simplified
+    return ring
+
+def zone_hulls(coords: np.ndarray, groups: dict, tolerance: float = 0.0) -> dict:
+    # {zone: (M,2) lon/lat hull ring}, computed once and shared by both map renderers; degenerate zones are left out.
+    # coords is the (N,2) lon/lat array of all rows, groups maps zone -> positional row indices.
+    hulls = {}
+    for z, idx in groups.items():
+        ring = _hull_ring(coords[idx], tolerance)  # x=lon, y=lat
+        if ring is not None:
+            hulls[z] = ring
+    return hulls
+
+# Above this many points the Leaflet map switches from styled circle markers to client-side clustering.
+FAST_CLUSTER_MIN_POINTS = 5000
+_FAST_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                {radius: 6, color: row[2], fillColor: row[2], fillOpacity: 0.85});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+def make_folium_map(df: pd.DataFrame, hulls: dict, centers: pd.DataFrame, center: Tuple[float,float], out_html: str):
     m = folium.Map(location=center, zoom_start=9, tiles="CartoDB positron", control_scale=True)
-    colors = {int(z): c for z, c in zip(sorted(df["zone"].unique()), color_cycle(df["zone"].nunique()))}
-    for _, r in df.iterrows():
-        folium.CircleMarker((r.lat, r.lon), radius=6, color=colors[int(r.zone)],
-                            fill=True, fill_opacity=0.85,
-                            tooltip=f"Zone {int(r.zone)} - {r.get('name','')}").add_to(m)
-    for z, sub in df.groupby("zone"):
-        pts = [Point(yx[0], yx[1]) for yx in sub[["lat","lon"]].to_numpy()]
-        hull = MultiPoint(pts).convex_hull
+    color_arr, zone_idx = _zone_colors(df)
+    colors = color_arr.tolist()
+    tips = ("Zone " + df["zone"].astype(str) + " - " + df["name"].astype(str)).tolist()
+    lats, lons, zones = df["lat"].tolist(), df["lon"].tolist(), (zone_idx + 1).tolist()
+    if len(df) >= FAST_CLUSTER_MIN_POINTS:
+        # Rows ship as one compact JS array; markers are created client-side and clustered.
+        rows = [[lat, lon, colors[z - 1], tip] for lat, lon, z, tip in zip(lats, lons, zones, tips)]
+        FastMarkerCluster(rows, callback=_FAST_MARKER_JS, name="Addresses").add_to(m)
+    else:
+        # One GeoJson layer instead of a JS object per marker; folium dedupes the per-zone styles.
+        feats = [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                  "properties": {"zone": z, "tooltip": tip}}
+                 for lat, lon, z, tip in zip(lats, lons, zones, tips)]
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": feats},
+            name="Addresses",
+            marker=folium.CircleMarker(radius=6, fill=True, fill_opacity=0.85),
+            style_function=lambda f: {"color": colors[f["properties"]["zone"] - 1], "fillColor": colors[f["properties"]["zone"] - 1],
+                                      "fillOpacity": 0.85, "radius": 6},
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+        ).add_to(m)
+    for z, ring in hulls.items():
+        col = colors[z - 1]
         folium.GeoJson(
-            hull.__geo_interface__,
-            style_function=lambda x, col=colors[int(z)]: {"color": col, "fillColor": col, "fillOpacity": 0.10, "weight": 2},
-            name=f"Zone {int(z)}"
+            {"type": "Polygon", "coordinates": [ring.tolist()]},
+            style_function=lambda x, col=col: {"color": col, "fillColor": col, "fillOpacity": 0.10, "weight": 2},
+            name=f"Zone {z}"
         ).add_to(m)
-    for _, r in centers.iterrows():
+    for r in centers.itertuples(index=False):
         folium.Marker((r.lat, r.lon), tooltip=f"Zone {int(r.zone)} center").add_to(m)
     folium.LayerControl().add_to(m)
     m.save(out_html)
     return out_html
 
-def make_google_maps_html(df: pd.DataFrame, centers: pd.DataFrame, api_key: str, out_html: str):
+# Parsed and compiled once at import; each call only renders the payloads into it.
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "gmap.html.j2"), encoding="utf-8") as _f:
+    _GMAP_TMPL = jinja2.Template(_f.read())
+
+def _dumps(obj) -> str:
+    # orjson handles numpy scalars/arrays and int dict keys natively and is much faster than stdlib json.
+    # "</" is escaped so a value can never close the inline <script> it is embedded in.
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode("utf-8").replace("</", "<\\/")
+
+def make_google_maps_html(df: pd.DataFrame, hulls: dict, centers: pd.DataFrame, api_key: str, out_html: str):
     if not api_key:
         raise SystemExit("Missing --google-key required for --make-google-map.")
-    colors = {int(z): c for z, c in zip(sorted(df["zone"].unique()), color_cycle(df["zone"].nunique()))}
-    zone_polys = {}
-    for z, sub in df.groupby("zone"):
-        pts = [Point(yx[1], yx[0]) for yx in sub[["lon","lat"]].to_numpy()]  # x=lon, y=lat
-        hull = MultiPoint(pts).convex_hull
-        if hull.geom_type == "Polygon":
-            zone_polys[int(z)] = list(hull.exterior.coords)  # (lon,lat)
-    pts_js = [{"name": str(r.get("name","")), "lat": float(r["lat"]), "lon": float(r["lon"]), "zone": int(r["zone"])} for _, r in df.iterrows()]
-    centers_js = [{"lat": float(r["lat"]), "lon": float(r["lon"]), "zone": int(r["zone"])} for _, r in centers.iterrows()]
-    hulls_js = {int(z): [{"lat": float(lat), "lng": float(lon)} for (lon,lat) in coords] for z, coords in zone_polys.items()}
-
-    html = f"""<!doctype html>
-<html>
-<head>
-<meta charset="utf-8"/>
-<title>Google Map - Cluster Zones</title>
-<style>html,body,#map{{height:100%;margin:0}} .legend{{position:absolute;background:#fff;padding:8px;border:1px solid #ddd;right:12px;top:12px;font:12px/1.3 sans-serif}}</style>
-<script src="https://maps.googleapis.com/maps/api/js?key={api_key}"></script>
-</head>
-<body>
-<div id="map"></div>
-<div class="legend" id="legend"></div>
-<script>
-const dataPoints = {json.dumps(pts_js)};
-const centers = {json.dumps(centers_js)};
-const hulls = {json.dumps(hulls_js)};
-const zoneColors = {json.dumps(colors)};
-
-function init() {{
-  const center = {{
-    lat: dataPoints.reduce((a,b)=>a+b.lat,0)/dataPoints.length,
-    lng: dataPoints.reduce((a,b)=>a+b.lon,0)/dataPoints.length
-  }};
-  const map = new google.maps.Map(document.getElementById('map'), {{center, zoom: 10}});
-  for (const p of dataPoints) {{
-    new google.maps.Marker({{
-      position: {{lat: p.lat, lng: p.lon}},
-      map,
-      title: `Zone ${'{'}p.zone{'}'} - ${'{'}p.name{'}'}`,
-      icon: {{
-        path: google.maps.SymbolPath.CIRCLE,
-        fillColor: zoneColors[p.zone], fillOpacity: 1, strokeWeight: 1, scale: 6, strokeColor: '#333'
-      }}
-    }});
-  }}
-  for (const [zone, path] of Object.entries(hulls)) {{
-    new google.maps.Polygon({{
-      paths: path,
-      strokeColor: zoneColors[zone], strokeOpacity: 0.9, strokeWeight: 2,
-      fillColor: zoneColors[zone], fillOpacity: 0.10,
-      map
-    }});
-  }}
-  for (const c of centers) {{
-    new google.maps.Marker({{
-      position: {{lat: c.lat, lng: c.lon}},
-      map,
-      icon: 'https://maps.google.com/mapfiles/ms/icons/blue-dot.png',
-      title: `Zone ${'{'}c.zone{'}'} center`
-    }});
-  }}
-  const legend = document.getElementById('legend');
-  legend.innerHTML = Object.entries(zoneColors)
-    .map(([z,col]) => `<div><span style="display:inline-block;width:12px;height:12px;background:${'{'}col{'}'};margin-right:6px;border:1px solid #999"></span>Zone ${'{'}z{'}'}</div>`)
-    .join('');
-  map.controls[google.maps.ControlPosition.RIGHT_TOP].push(legend);
-}}
-window.onload = init;
-</script>
-</body>
-</html>"""
+    color_arr, zone_idx = _zone_colors(df)
+    colors = {z: str(c) for z, c in enumerate(color_arr, 1)}
+    pts_js = df[["name","lat","lon"]].assign(name=df["name"].astype(str), zone=zone_idx + 1).to_dict(orient="records")
+    centers_js = centers[["lat","lon","zone"]].to_dict(orient="records")
+    hulls_js = {z: [{"lat": lat, "lng": lon} for lon, lat in coords.tolist()] for z, coords in hulls.items()}
+
+    html = _GMAP_TMPL.render(api_key=api_key, pts_js=_dumps(pts_js), centers_js=_dumps(centers_js),
+                             hulls_js=_dumps(hulls_js), colors=_dumps(colors))
     with open(out_html, "w", encoding="utf-8") as f:
         f.write(html)
     return out_html
 
 # ----------------------------- exports ----------------------------------------
 
-def export_excel(df: pd.DataFrame, out_prefix: str):
+def _write_sheet(wb, name: str, header: list, rows: list, header_fmt):
+    ws = wb.add_worksheet(name)
+    ws.write_row(0, 0, header, header_fmt)
+    for i, row in enumerate(rows, 1):
+        ws.write_row(i, 0, row)
+
+def export_excel(df: pd.DataFrame, groups: dict, out_prefix: str):
+    # constant_memory flushes each row as soon as the next one starts, so cells must be written
+    # strictly row by row. DataFrame.to_excel writes column by column, so rows go through xlsxwriter directly.
     import xlsxwriter
     xlsx = f"{out_prefix}_zones.xlsx"
-    with pd.ExcelWriter(xlsx, engine="xlsxwriter") as xw:
-        for z, sub in df.groupby("zone"):
-            cols = [c for c in ["zone","name","address","city","state","zip","lat","lon"] if c in sub.columns]
-            sub[cols].to_excel(xw, sheet_name=f"Zone_{int(z)}", index=False)
-        summary = df.groupby("zone").size().rename("count").reset_index()
-        summary.to_excel(xw, sheet_name="Summary", index=False)
+    wb = xlsxwriter.Workbook(xlsx, {"constant_memory": True})
+    try:
+        header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center"})
+        cols = [c for c in ["zone","name","address","city","state","zip","lat","lon"] if c in df.columns]
+        vals = df[cols].to_numpy(dtype=object)
+        vals[pd.isna(vals)] = None  # blank cells, as to_excel would write
+        for z, idx in groups.items():
+            _write_sheet(wb, f"Zone_{z}", cols, vals[idx].tolist(), header_fmt)
+        _write_sheet(wb, "Summary", ["zone", "count"], [[z, len(idx)] for z, idx in groups.items()], header_fmt)
+    finally:
+        wb.close()
     return xlsx
 
 # ----------------------------- main -------------------------------------------
@@ -271,12 +560,22 @@ def main():
     ap.add_argument("--city", default="", help="Optional context to append (e.g., 'Atlanta, GA', 'Missouri').")
     ap.add_argument("--kmin", type=int, default=6)
     ap.add_argument("--kmax", type=int, default=8)
+    ap.add_argument("--patience", type=int, default=2,
+                    help="Stop the k sweep after this many k without a better silhouette (0 disables).")
+    ap.add_argument("--fast-silhouette", action="store_true",
+                    help="Score k with a centroid-distance silhouette approximation (O(N*k) instead of pairwise).")
+    ap.add_argument("--kmeans-impl", choices=["sklearn","numba2d"], default="sklearn",
+                    help="KMeans backend; numba2d is a parallel Lloyd kernel specialised for 2-D points (requires numba).")
     ap.add_argument("--geocoder", choices=["opencage","geoapify","google","qgis"], default="opencage")
     ap.add_argument("--opencage-key", default=os.getenv("OPENCAGE_KEY"))
     ap.add_argument("--geoapify-key", default=os.getenv("GEOAPIFY_KEY"))
     ap.add_argument("--google-key", default=os.getenv("GOOGLE_MAPS_KEY"))
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Where geocoder results are cached between runs.")
+    ap.add_argument("--no-cache", action="store_true", help="Neither read nor write the geocoder cache.")
     ap.add_argument("--out-prefix", default="zones")
     ap.add_argument("--make-google-map", action="store_true", help="Also emit a Google Maps JS HTML (requires --google-key).")
+    ap.add_argument("--hull-tolerance", type=float, default=0.0005,
+                    help="Simplify zone hulls with this tolerance in degrees before rendering (0 disables).")
     args = ap.parse_args()
 
     df = pd.read_csv(args.input)
@@ -288,27 +587,34 @@ def main():
 
     # Geocode
     keys = {"opencage": args.opencage_key, "geoapify": args.geoapify_key, "google": args.google_key}
-    df = geocode_df(df, args.geocoder, keys, args.city)
+    df = geocode_df(df, args.geocoder, keys, args.city, cache_dir=None if args.no_cache else args.cache_dir)
     if df.empty:
         raise SystemExit("No rows with valid lat/lon. Check input and API keys.")
 
     # Cluster
-    X = df[["lat","lon"]].to_numpy()
-    k = choose_best_k(X, args.kmin, args.kmax, seed=42)
-    km = KMeans(n_clusters=k, n_init=25, random_state=42)
+    lat0, lon0 = float(df["lat"].mean()), float(df["lon"].mean())
+    X = to_local_xy(df["lat"].to_numpy(), df["lon"].to_numpy(), lat0, lon0)
+    k = choose_best_k(X, args.kmin, args.kmax, seed=42, patience=args.patience,
+                      fast_silhouette=args.fast_silhouette, kmeans_impl=args.kmeans_impl)
+    km = make_kmeans(args.kmeans_impl, k, n_init=25, seed=42)
     df["zone"] = km.fit_predict(X) + 1
 
-    centers = pd.DataFrame(km.cluster_centers_, columns=["lat","lon"])
+    c_lat, c_lon = from_local_xy(km.cluster_centers_, lat0, lon0)
+    centers = pd.DataFrame({"lat": c_lat, "lon": c_lon})
     centers["zone"] = range(1, k+1)
 
     # Outputs
     out_prefix = args.out_prefix
     df.sort_values(["zone","name"]).to_csv(f"{out_prefix}_zones.csv", index=False)
-    xlsx = export_excel(df, out_prefix)
+    # Group once; the Excel sheets and both maps' hulls all come from this single pass.
+    # groupby.indices gives positional row indices per zone without building sub-DataFrames.
+    groups = {int(z): idx for z, idx in sorted(df.groupby("zone").indices.items())}
+    hulls = zone_hulls(df[["lon","lat"]].to_numpy(), groups, args.hull_tolerance)
+    xlsx = export_excel(df, groups, out_prefix)
 
     center = (float(df["lat"].mean()), float(df["lon"].mean()))
     leaflet = f"{out_prefix}_leaflet_map.html"
-    make_folium_map(df, centers, center, leaflet)
+    make_folium_map(df, hulls, centers, center, leaflet)
     # comment
 
     gmap = None
@@ -316,7 +622,7 @@ def main():
         if not args.google_key:
             raise SystemExit("Provide --google-key for --make-google-map.")
         gmap = f"{out_prefix}_google_map.html"
-        make_google_maps_html(df, centers, args.google_key, gmap)
+        make_google_maps_html(df, hulls, centers, args.google_key, gmap)
 
     print(f"Done. K={k}\n- {out_prefix}_zones.csv\n- {out_prefix}_zones.xlsx\n- {leaflet}")
     if gmap: